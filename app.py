@@ -1,9 +1,10 @@
 from PySide6 import QtWidgets
 import sys
-from main_window import MainWindow
 
 def main():
     app = QtWidgets.QApplication(sys.argv)
+    # imported here so `import app` doesn't pull in vispy/trimesh/matplotlib
+    from main_window import MainWindow
     w = MainWindow()
     w.show()
     sys.exit(app.exec())
@@ -2,6 +2,75 @@
 
 import numpy as np
 
+_fast = None
+
+
+def _bands_fast():
+    # bands_fast pulls in numba, which is slow to import; load it on first use, not
+    # when the GUI imports this module
+    global _fast
+    if _fast is None:
+        import bands_fast
+        _fast = bands_fast
+    return _fast
+
+
 def resample_bands(src_freqs, src_vals, dst_freqs):
     """Log-frequency interpolation from src to dst."""
+    if len(src_freqs) != len(src_vals):
+        raise ValueError("src_freqs and src_vals must have the same length")
+    # the JIT kernel skips NumPy's per-call dispatch, which dominates on short band arrays
+    if len(src_vals) > 4 and np.ndim(dst_freqs) == 1:
+        fast = _bands_fast()
+        if fast._resample_kernel is not None:
+            return fast.resample_bands_fast(src_freqs, src_vals, dst_freqs)
     return np.interp(np.log10(dst_freqs), np.log10(src_freqs), src_vals)
+
+
+class BandResampler:
+    """
+    resample_bands() for a fixed (src_freqs, dst_freqs) pair.
+    The log10s and the interval search are done once in __init__; each call is
+    then a gather + blend over the last axis, so it also accepts (N, B) stacks.
+    Out-of-range destinations clamp to the end values, same as np.interp.
+    """
+
+    def __init__(self, src_freqs, dst_freqs):
+        self.log10_src = np.log10(np.asarray(src_freqs, dtype=float))
+        self.log10_dst = np.log10(np.asarray(dst_freqs, dtype=float))
+        n = self.log10_src.size
+        if n < 2:
+            self.left = np.zeros(self.log10_dst.size, dtype=np.intp)
+            self.weight = np.zeros(self.log10_dst.size)
+        else:
+            left = np.searchsorted(self.log10_src, self.log10_dst, side="right") - 1
+            left = np.clip(left, 0, n - 2)
+            x0 = self.log10_src[left]
+            x1 = self.log10_src[left + 1]
+            self.left = left
+            self.weight = np.clip((self.log10_dst - x0) / (x1 - x0), 0.0, 1.0)
+        self.right = np.minimum(self.left + 1, max(n - 1, 0))
+
+    def __call__(self, src_vals):
+        v = np.asarray(src_vals)
+        if v.dtype.kind != "f":
+            v = v.astype(float)
+        # blend in the input's precision, so float32 stacks stay float32
+        w = self.weight.astype(v.dtype, copy=False)
+        return v[..., self.left] * (1 - w) + v[..., self.right] * w
+
+    def resample_matrix(self, mat, out=None):
+        """
+        Resample every row of a 2-D (N, B_src) stack into out (N, B_dst), allocated in
+        mat's float dtype when not given. Uses the parallel numba kernel when available.
+        """
+        mat = np.asarray(mat)
+        if mat.dtype.kind != "f":
+            mat = mat.astype(float)
+        if out is None:
+            out = np.empty((mat.shape[0], self.left.size), dtype=mat.dtype)
+        kernel = _bands_fast()._resample_matrix_kernel if mat.shape[0] > 0 else None
+        if kernel is not None:
+            return kernel(self.left, self.right, self.weight, np.ascontiguousarray(mat), out)
+        out[...] = self(mat)
+        return out
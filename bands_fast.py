@@ -0,0 +1,56 @@
+"""Numba kernels for band resampling. Optional: callers fall back to NumPy without numba."""
+
+import numpy as np
+
+try:
+    import numba
+except Exception:
+    numba = None
+
+
+if numba is not None:
+    @numba.njit(cache=True, fastmath=True)
+    def _resample_kernel(src_freqs, dst_freqs, src_vals, out):
+        # log-frequency linear interpolation, clamped at both ends like np.interp
+        n = src_freqs.shape[0]
+        log_src = np.empty(n)
+        for i in range(n):
+            log_src[i] = np.log10(src_freqs[i])
+        for j in range(dst_freqs.shape[0]):
+            x = np.log10(dst_freqs[j])
+            if x <= log_src[0]:
+                out[j] = src_vals[0]
+            elif x >= log_src[n - 1]:
+                out[j] = src_vals[n - 1]
+            else:
+                lo = 0
+                hi = n - 1
+                while hi - lo > 1:
+                    mid = (lo + hi) >> 1
+                    if log_src[mid] <= x:
+                        lo = mid
+                    else:
+                        hi = mid
+                w = (x - log_src[lo]) / (log_src[hi] - log_src[lo])
+                out[j] = src_vals[lo] + (src_vals[hi] - src_vals[lo]) * w
+        return out
+
+    @numba.njit(cache=True, fastmath=True, parallel=True)
+    def _resample_matrix_kernel(left, right, weight, mat, out):
+        # BandResampler's precomputed gather + blend, one row (material) per thread
+        for i in numba.prange(mat.shape[0]):
+            for j in range(left.shape[0]):
+                a = mat[i, left[j]]
+                out[i, j] = a + (mat[i, right[j]] - a) * weight[j]
+        return out
+else:
+    _resample_kernel = None
+    _resample_matrix_kernel = None
+
+
+def resample_bands_fast(src_freqs, src_vals, dst_freqs):
+    """Numba version of bands.resample_bands (requires numba and a non-empty source)."""
+    src_f = np.ascontiguousarray(src_freqs, dtype=np.float64)
+    src_v = np.ascontiguousarray(src_vals, dtype=np.float64)
+    dst_f = np.ascontiguousarray(dst_freqs, dtype=np.float64)
+    return _resample_kernel(src_f, dst_f, src_v, np.empty(dst_f.shape[0]))
@@ -1 +1,56 @@
-# placeholder for <module-name>
+# caching.py — small bounded caches shared by ATLAS modules
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Bounded mapping with least-recently-used eviction.
+    The most recent entry is also held in two plain fields, so looking up the
+    same key again (the common case in redraw/update paths) skips the dict.
+    """
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = max(1, int(maxsize))
+        self._data = OrderedDict()
+        self._last_key = _MISSING
+        self._last_value = None
+
+    def get(self, key, default=None):
+        if key == self._last_key:
+            return self._last_value
+        try:
+            value = self._data[key]
+        except KeyError:
+            return default
+        self._data.move_to_end(key)
+        self._last_key, self._last_value = key, value
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        self._last_key, self._last_value = key, value
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        if key == self._last_key:
+            self._last_key, self._last_value = _MISSING, None
+        return self._data.pop(key, default)
+
+    def discard_where(self, pred):
+        """Drop every entry whose key satisfies pred(key)."""
+        for key in [k for k in self._data if pred(k)]:
+            self.pop(key)
+
+    def clear(self):
+        self._data.clear()
+        self._last_key, self._last_value = _MISSING, None
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
@@ -1,34 +1,77 @@
 # geometry_tools.py
+import weakref
 import numpy as np
+from caching import LRUCache
 
-try:
-    import trimesh
-except Exception:
-    trimesh = None
+# trimesh pulls in scipy/networkx/rtree; import it on first use only
+_trimesh = None
+
+
+def _get_trimesh():
+    global _trimesh
+    if _trimesh is None:
+        try:
+            import trimesh
+        except Exception:
+            raise RuntimeError("trimesh is not installed in this environment.")
+        _trimesh = trimesh
+    return _trimesh
+
+# id(mesh) -> bool; entries are evicted when the mesh is garbage collected (or by LRU)
+_WATERTIGHT_CACHE = LRUCache(maxsize=64)
+# (id(mesh), mode, pad_rel) -> enclosure box; evicted with the mesh (or by LRU)
+_BOX_CACHE = LRUCache(maxsize=16)
 
 def is_watertight(m) -> bool:
+    """Robust check for watertightness (memoized per mesh object)."""
     if m is None:
         return False
+    key = id(m)
+    cached = _WATERTIGHT_CACHE.get(key)
+    if cached is not None:
+        return cached
     try:
-        return bool(m.is_watertight)
+        result = bool(m.is_watertight)
     except Exception:
         return False
+    try:
+        weakref.finalize(m, _WATERTIGHT_CACHE.pop, key, None)
+    except TypeError:
+        # not weak-referenceable: don't cache, id() could be reused
+        return result
+    _WATERTIGHT_CACHE.put(key, result)
+    return result
 
 def make_bounding_box(m, mode: str = "aabb", pad_rel: float = 0.05):
-    if trimesh is None:
-        raise RuntimeError("trimesh not installed")
+    """
+    Create a thin shell box that encloses mesh m.
+    mode: "aabb" (axis-aligned) or "obb" (oriented by principal axes)
+    pad_rel: padding as a fraction of the model's max extent
+    """
+    trimesh = _get_trimesh()
     if m.vertices.size == 0:
         raise ValueError("Empty mesh")
-    bb_min, bb_max = m.bounds
+    key = (id(m), mode.lower(), round(float(pad_rel), 6))
+    cached = _BOX_CACHE.get(key)
+    if cached is not None:
+        # hand out a copy so callers mutating the box don't corrupt the cache
+        return cached.copy()
+    # reduce the raw vertex array directly instead of going through m.bounds
+    v = np.asarray(m.vertices, dtype=np.float64)
+    bb_min = v.min(axis=0)
+    bb_max = v.max(axis=0)
     diag = float(np.linalg.norm(bb_max - bb_min))
     diag = max(diag, 1e-6)
     pad = diag * float(pad_rel)
 
     if mode.lower() == "obb":
+        # Transform to the principal inertia frame, build AABB there, then transform back.
         T = m.principal_inertia_transform
-        m_local = m.copy()
-        m_local.apply_transform(np.linalg.inv(T))
-        bb_min_l, bb_max_l = m_local.bounds
+        # bounds in the principal frame without copying/transforming the whole mesh
+        Tinv = np.linalg.inv(T)
+        v_local = v @ Tinv[:3, :3].T + Tinv[:3, 3]
+        bb_min_l = v_local.min(axis=0)
+        bb_max_l = v_local.max(axis=0)
         extents = (bb_max_l - bb_min_l) + 2 * pad
         center_l = (bb_min_l + bb_max_l) * 0.5
         box_local = trimesh.creation.box(extents=extents)
@@ -43,7 +86,28 @@ def make_bounding_box(m, mode: str = "aabb", pad_rel: float = 0.05):
 
     # inward normals
     box.faces = box.faces[:, ::-1]
-    return box
+    try:
+        weakref.finalize(m, _BOX_CACHE.pop, key, None)
+    except TypeError:
+        return box
+    _BOX_CACHE.put(key, box)
+    return box.copy()
+
+def add_enclosure_if_needed(m, parts: list, enabled: bool = True, mode: str = "aabb",
+                            pad_rel: float = 0.05, part_name: str = "Bounds"):
+    """
+    If mesh isn't watertight and 'enabled', append a bounding box part.
+    Returns updated parts list.
+    """
+    if not enabled:
+        return parts
+    try:
+        if not is_watertight(m):
+            box = make_bounding_box(m, mode=mode, pad_rel=pad_rel)
+            parts = parts + [(part_name, box)]
+    except Exception as e:
+        print(f"[WARN] add_enclosure_if_needed failed: {e}")
+    return parts
 
 def add_or_update_enclosure(mesh, parts_named, enabled: bool, mode: str, pad_rel: float,
                             force: bool = False, part_name: str = "Bounds"):
@@ -1,14 +1,41 @@
 # logger.py — centralized logging for ATLAS
 
-from PySide6 import QtWidgets
+import os, sys
+from PySide6 import QtWidgets, QtCore
+
+# Echo log lines to stdout only when requested (ATLAS_LOG_STDOUT=1)
+LOG_STDOUT = os.environ.get("ATLAS_LOG_STDOUT", "") not in ("", "0")
 
 class Logger:
     def __init__(self, text_box: QtWidgets.QPlainTextEdit, status_bar: QtWidgets.QStatusBar):
         self.text_box = text_box
         self.status_bar = status_bar
+        # Messages are buffered and written out in one go, so a burst of log calls
+        # costs one append/relayout instead of one per line. The flush is scheduled
+        # once per burst (not restarted per call), so steady logging can't starve it.
+        self._pending = []
+        self._last_status = ""
+        self._flush_scheduled = False
 
-    def log(self, msg: str, error: bool = False):
+    def log(self, msg: str, error: bool = False, details=None):
+        """details: optional zero-arg callable returning extra text (e.g. a traceback);
+        it is written under the message, but only called when the buffer is flushed."""
         prefix = "[ERROR] " if error else ""
-        self.text_box.appendPlainText(prefix + msg)
-        self.status_bar.showMessage(msg, 6000)
-        print(msg)
+        self._pending.append(prefix + msg)
+        if details is not None:
+            self._pending.append(details)     # formatted at flush time
+        self._last_status = msg
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            QtCore.QTimer.singleShot(0, self.text_box, self.flush)
+
+    def flush(self):
+        self._flush_scheduled = False
+        if not self._pending:
+            return
+        text = "\n".join(p if isinstance(p, str) else p().rstrip("\n") for p in self._pending)
+        self._pending.clear()
+        self.text_box.appendPlainText(text)
+        self.status_bar.showMessage(self._last_status, 6000)
+        if LOG_STDOUT:
+            sys.stdout.write(text + "\n")
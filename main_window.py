@@ -1,19 +1,58 @@
-from PySide6 import QtWidgets, QtGui
-import os, json, traceback
+from PySide6 import QtWidgets, QtCore
+import os, sys, hashlib, traceback
 
-import geometry, viz
-from material_db import MaterialDB
 from logger import Logger
 from project import ProjectState
 from ui_helpers import make_geometry_dock, make_materials_dock, make_log_dock
-from geometry_tools import add_or_update_enclosure, reorder_bounds_last
+from geometry_tools import add_or_update_enclosure
 from materials_tools import ensure_free_space_material
-from project_io import serialize_project, load_project_into_state
+from project_io import serialize_project, load_project_into_state, dumps_json, read_json, write_atomic
 
 DEFAULT_LIB = os.path.join(os.path.dirname(__file__), "material_library_1_3oct.json")
 
-def log_exc(prefix: str) -> str:
-    return f"{prefix}:\n{traceback.format_exc()}"
+def log_exc(prefix: str):
+    """
+    (message, details) for the exception being handled. details() formats the
+    traceback on first call and returns the same text after that, so a dialog and
+    the log can both show it for one format; the frames are released once it's done.
+    """
+    exc_type, exc, tb = sys.exc_info()
+    message = f"{prefix}: {exc}"
+    formatted = None
+
+    def details():
+        nonlocal formatted, exc_type, exc, tb
+        if formatted is None:
+            formatted = "".join(traceback.format_exception(exc_type, exc, tb))
+            exc_type = exc = tb = None   # exc holds the traceback too
+        return formatted
+
+    return message, details
+
+class _MeshLoadSignals(QtCore.QObject):
+    done = QtCore.Signal(int, str, object, object)   # token, path, mesh, components
+    failed = QtCore.Signal(int, str, str, object)    # token, path, message, details()
+
+
+class _MeshLoader(QtCore.QRunnable):
+    """geometry.load_mesh + split_mesh on a QThreadPool worker; results come back as signals."""
+
+    def __init__(self, token: int, path: str):
+        super().__init__()
+        self.token = token
+        self.path = path
+        self.signals = _MeshLoadSignals()   # created on the UI thread, so slots run there
+
+    def run(self):
+        try:
+            import geometry
+            m = geometry.load_mesh(self.path)
+            comps = geometry.split_mesh(m)
+        except Exception:
+            self.signals.failed.emit(self.token, self.path, *log_exc("Geometry load failed"))
+            return
+        self.signals.done.emit(self.token, self.path, m, comps)
+
 
 class MainWindow(QtWidgets.QMainWindow):
     def __init__(self):
@@ -26,8 +65,15 @@ class MainWindow(QtWidgets.QMainWindow):
         self.logger = None
         self.current_project_file = None
         self.current_mesh_path = None
+        self._parts_rows = []               # texts currently shown in parts_list, by row
+        self._last_saved_hash = None        # (path, digest) of the last project write
+        self._last_draw = None              # (mode, highlight, parts list, state, assign_ver) last drawn
+        self._mesh_load_token = 0           # id of the newest background mesh load
+        self._mesh_load = None              # (loader, continuation) while a load is running
+        self._busy = None                   # QProgressDialog shown during a load
 
         # ---------- Central Viewer ----------
+        import viz
         self.canvas, self.view = viz.init_canvas()
         self.setCentralWidget(self.canvas.native)
 
@@ -44,8 +90,13 @@ class MainWindow(QtWidgets.QMainWindow):
             self, self.on_load_geometry, self.on_mode_changed, self.on_part_selected, self.on_enclosure_now
         )
         self.dock_mat, self.search_mat, self.materials_list, self.plot = make_materials_dock(
-            self, self.refresh_materials_list, self.on_material_selected, self.on_assign_material
+            self, self._on_search_changed, self.on_material_selected, self.on_assign_material
         )
+        # filter once per typing burst rather than once per keystroke
+        self._search_timer = QtCore.QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(120)
+        self._search_timer.timeout.connect(self.refresh_materials_list)
         self.dock_log, self.log_box = make_log_dock(self)
         self.logger = Logger(self.log_box, self.statusBar())
 
@@ -55,19 +106,35 @@ class MainWindow(QtWidgets.QMainWindow):
         # ---------- Menu ----------
         self._build_menu()
 
+        # ---------- File watching ----------
+        # push-based invalidation for caches derived from files on disk
+        self._watcher = QtCore.QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_watched_file_changed)
+        # act once a burst of change events settles, so a file still being written
+        # isn't read half-finished
+        self._changed_paths = set()
+        self._watch_timer = QtCore.QTimer(self)
+        self._watch_timer.setSingleShot(True)
+        self._watch_timer.setInterval(500)
+        self._watch_timer.timeout.connect(self._handle_changed_files)
+
         # ---------- Autoload materials ----------
         if os.path.exists(DEFAULT_LIB):
             try:
-                self.state.matlib = MaterialDB.from_json(DEFAULT_LIB)
+                from material_db import MaterialDB
+                self.state.matlib = MaterialDB.load_cached(DEFAULT_LIB)
                 self.logger.log(f"Materials auto-loaded: {len(self.state.matlib.items)} entries")
                 self.refresh_materials_list()
             except Exception:
-                self.logger.log(log_exc("Material auto-load failed"), error=True)
+                msg, details = log_exc("Material auto-load failed")
+                self.logger.log(msg, error=True, details=details)
 
+        self._sync_watched_files()
         self.logger.log("Ready.")
 
     # =================== Menu ===================
     def _build_menu(self):
+        from PySide6 import QtGui
         bar = self.menuBar()
         file_menu = bar.addMenu("&File")
 
@@ -80,6 +147,54 @@ class MainWindow(QtWidgets.QMainWindow):
         for a in (act_new, act_open, act_save, act_save_as, act_exit):
             file_menu.addAction(a)
 
+    # =================== File watching ===================
+    def _sync_watched_files(self):
+        wanted = {p for p in (DEFAULT_LIB, self.current_mesh_path, self.current_project_file)
+                  if p and os.path.exists(p)}
+        watched = set(self._watcher.files())
+        if watched - wanted:
+            self._watcher.removePaths(list(watched - wanted))
+        if wanted - watched:
+            self._watcher.addPaths(list(wanted - watched))
+
+    def _on_watched_file_changed(self, path: str):
+        self._changed_paths.add(path)
+        self._watch_timer.start()           # restarts the wait on every event of a burst
+
+    def _handle_changed_files(self):
+        # editors (and atomic saves) replace the file, which drops it from the watcher;
+        # re-adding only now means a file briefly missing mid-replace is watched again
+        self._sync_watched_files()
+        paths, self._changed_paths = self._changed_paths, set()
+        for path in paths:
+            self._handle_changed_file(path)
+
+    def _handle_changed_file(self, path: str):
+        if path == DEFAULT_LIB and os.path.exists(path):
+            try:
+                from material_db import MaterialDB
+                self.state.matlib = MaterialDB.load_cached(DEFAULT_LIB)  # new mtime -> re-parse
+                self.logger.log(f"Material library changed on disk; reloaded {len(self.state.matlib.items)} entries")
+                self.refresh_materials_list()
+            except Exception:
+                msg, details = log_exc("Material reload failed")
+                self.logger.log(msg, error=True, details=details)
+        elif path == self.current_mesh_path and os.path.exists(path):
+            # reload in the background and carry over the assignments of parts that still exist;
+            # the old mesh's cached watertight/box results go with it (weakref eviction)
+            self.logger.log(f"Mesh file changed on disk: {os.path.basename(path)}; reloading")
+            saved = dict(self.state.assignments)
+            self._load_mesh_from_path(path, then=lambda: self._reapply_assignments(saved))
+        elif path == self.current_project_file and self._last_saved_hash is not None:
+            # our own save also fires this; only forget the hash if the content differs
+            try:
+                with open(path, "rb") as f:
+                    digest = hashlib.blake2b(f.read(), digest_size=16).digest()
+            except OSError:
+                digest = None
+            if (path, digest) != self._last_saved_hash:
+                self._last_saved_hash = None
+
     # =================== Helpers ===================
     def _enclosure_settings(self):
         enabled = bool(self.chk_enclosure.isChecked())
@@ -94,20 +209,45 @@ class MainWindow(QtWidgets.QMainWindow):
     def _draw(self, highlight_name=None):
         if not self.state.parts:
             return
+        import viz
+        mode = self._current_render_mode()
+        last = self._last_draw
+        # the parts list is held (not just its id) so a recycled id can't alias it
+        same_scene = (last is not None and last[0] == mode and last[2] is self.state.parts
+                      and last[3] is self.state and last[4] == self.state.assign_ver)
+        if same_scene and last[1] == highlight_name:
+            return
+        self._last_draw = (mode, highlight_name, self.state.parts, self.state, self.state.assign_ver)
+        if same_scene and viz.set_highlight(self.view, highlight_name):
+            return
         viz.draw_parts(
             self.view,
             self.state.parts,
-            mode=self._current_render_mode(),
-            color_map=self.state.material_color_map(),
+            mode=mode,
+            colors=self.state.material_color_array(),
             highlight_name=highlight_name,
         )
-        self.canvas.update()
 
     def refresh_parts_list(self):
-        self.parts_list.clear()
-        for name, comp in reorder_bounds_last(self.state.parts):
-            mat = self.state.assignments.get(name, "(none)")
-            self.parts_list.addItem(f"{name} | faces={len(comp.faces)} | area={comp.area:.3f} | mat={mat}")
+        get = self.state.assignments.get
+        rows = [f"{prefix} | mat={get(name, '(none)')}"
+                for (name, _), prefix in zip(self.state.parts_display, self.state.row_prefixes)]
+
+        # Diff against what's on screen: retext changed rows, add/remove only the tail
+        old = self._parts_rows
+        lst = self.parts_list
+        lst.setUpdatesEnabled(False)
+        try:
+            for i in range(min(len(old), len(rows))):
+                if old[i] != rows[i]:
+                    lst.item(i).setText(rows[i])
+            for i in range(len(old) - 1, len(rows) - 1, -1):
+                lst.takeItem(i)
+            if len(rows) > len(old):
+                lst.addItems(rows[len(old):])
+        finally:
+            lst.setUpdatesEnabled(True)
+        self._parts_rows = rows
 
     # =================== Geometry ===================
     def on_load_geometry(self):
@@ -119,11 +259,56 @@ class MainWindow(QtWidgets.QMainWindow):
             return
         self._load_mesh_from_path(path)
 
-    def _load_mesh_from_path(self, path: str):
+    def _load_mesh_from_path(self, path: str, then=None):
+        """Load + split on a worker thread; _on_mesh_loaded finishes on the UI thread, then calls then()."""
         self.logger.log(f"Loading mesh: {path}")
+        self._mesh_load_token += 1        # results of any older, still-running load are dropped
+        loader = _MeshLoader(self._mesh_load_token, path)
+        loader.signals.done.connect(self._on_mesh_loaded)
+        loader.signals.failed.connect(self._on_mesh_load_failed)
+        self._mesh_load = (loader, then)  # keep the runnable (and its signals) alive
+        self._set_busy(f"Loading {os.path.basename(path)}…")
+        QtCore.QThreadPool.globalInstance().start(loader)
+
+    def _cancel_mesh_load(self):
+        # a load still running finishes on its worker, but its result (and then()) is dropped
+        self._mesh_load_token += 1
+        self._mesh_load = None
+        self._set_busy(None)
+
+    def _set_busy(self, label=None):
+        if self._busy is not None:
+            self._busy.reset()
+            self._busy.deleteLater()
+            self._busy = None
+        if label:
+            dlg = QtWidgets.QProgressDialog(label, None, 0, 0, self)
+            dlg.setWindowModality(QtCore.Qt.WindowModal)
+            dlg.setMinimumDuration(300)   # quick loads never flash a dialog
+            dlg.setValue(0)
+            self._busy = dlg
+
+    def _report_error(self, title: str, msg: str, details):
+        self.logger.log(msg, error=True, details=details)
+        box = QtWidgets.QMessageBox(QtWidgets.QMessageBox.Critical, title, msg,
+                                    QtWidgets.QMessageBox.Ok, self)
+        box.setDetailedText(details())      # behind the dialog's "Show Details..." button
+        box.exec()
+
+    def _on_mesh_load_failed(self, token: int, path: str, msg: str, details):
+        if token != self._mesh_load_token:
+            return
+        self._mesh_load = None
+        self._set_busy(None)
+        self._report_error("Geometry load failed", msg, details)
+
+    def _on_mesh_loaded(self, token: int, path: str, m, comps):
+        if token != self._mesh_load_token:
+            return
+        _, then = self._mesh_load
+        self._mesh_load = None
+        self._set_busy(None)
         try:
-            m = geometry.load_mesh(path)
-            comps = geometry.split_mesh(m)
             parts = [(f"Part_{i}", c) for i, c in enumerate(comps)]
 
             # Add enclosure if needed
@@ -141,23 +326,25 @@ class MainWindow(QtWidgets.QMainWindow):
             # Set state
             self.state.mesh = m
             self.state.parts = parts
-            self.state.assignments.clear()
+            self.state.clear_assignments()
             self.current_mesh_path = path
 
             # Ensure & assign Free Space to Bounds if Bounds exists
-            if any(n == "Bounds" for n, _ in parts):
+            if self.state.has_part("Bounds"):
                 free_name = ensure_free_space_material(self.state.matlib, self.refresh_materials_list, self.logger)
                 if free_name:
-                    self.state.assignments["Bounds"] = free_name
+                    self.state.assign("Bounds", free_name)
                     self.logger.log(f'Auto-assigned "{free_name}" to Bounds')
 
             self.refresh_parts_list()
             self._draw()
+            self._sync_watched_files()
             self.logger.log(f"Loaded {len(self.state.parts)} parts from {os.path.basename(path)}")
         except Exception:
-            err = log_exc("Geometry load failed")
-            self.logger.log(err, error=True)
-            QtWidgets.QMessageBox.critical(self, "Geometry load failed", err)
+            self._report_error("Geometry load failed", *log_exc("Geometry load failed"))
+            return
+        if then is not None:
+            then()
 
     def on_enclosure_now(self):
         if not self.state.mesh:
@@ -178,7 +365,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self._draw()
         free_name = ensure_free_space_material(self.state.matlib, self.refresh_materials_list, self.logger)
         if free_name:
-            self.state.assignments["Bounds"] = free_name
+            self.state.assign("Bounds", free_name)
             self.logger.log(f'Assigned "{free_name}" → Bounds')
             self.refresh_parts_list()
             self._draw(highlight_name="Bounds")
@@ -195,16 +382,23 @@ class MainWindow(QtWidgets.QMainWindow):
             self._draw(highlight_name=name)
 
     # =================== Materials ===================
+    def _on_search_changed(self, _text=None):
+        self._search_timer.start()
+
     def refresh_materials_list(self):
-        self.materials_list.clear()
-        if not self.state.matlib:
-            self.materials_list.addItem("(no materials)")
-            return
-        q = self.search_mat.text().strip().lower()
-        for n in sorted(self.state.matlib.items.keys()):
-            if q and q not in n.lower():
-                continue
-            self.materials_list.addItem(n)
+        lst = self.materials_list
+        # nothing is selected after a rebuild, so the per-row selection signals are noise
+        lst.blockSignals(True)
+        lst.setUpdatesEnabled(False)
+        try:
+            lst.clear()
+            if not self.state.matlib:
+                lst.addItem("(no materials)")
+                return
+            lst.addItems(self.state.matlib.names_matching(self.search_mat.text().strip()))
+        finally:
+            lst.setUpdatesEnabled(True)
+            lst.blockSignals(False)
 
     def on_material_selected(self, row: int):
         if not self.state.matlib or row < 0:
@@ -223,9 +417,9 @@ class MainWindow(QtWidgets.QMainWindow):
         if idx < 0 or idx >= len(self.state.parts) or not mat_item:
             self.logger.log("Select a part and a material first.", error=True)
             return
-        part_name = self.state.parts[idx][0]
+        part_name, _ = self.state.parts[idx]
         mat_name = mat_item.text()
-        self.state.assignments[part_name] = mat_name
+        self.state.assign(part_name, mat_name)
         self.logger.log(f"Assigned {mat_name} → {part_name}")
         self.refresh_parts_list()
         self._draw(highlight_name=part_name)
@@ -239,11 +433,11 @@ class MainWindow(QtWidgets.QMainWindow):
         action = menu.exec_(self.parts_list.mapToGlobal(pos))
         if action == act_assign_fs:
             # ensure Bounds exists
-            if not any(n == "Bounds" for n, _ in self.state.parts):
+            if not self.state.has_part("Bounds"):
                 self.on_enclosure_now()
             free_name = ensure_free_space_material(self.state.matlib, self.refresh_materials_list, self.logger)
             if free_name:
-                self.state.assignments["Bounds"] = free_name
+                self.state.assign("Bounds", free_name)
                 self.logger.log(f'Assigned "{free_name}" → Bounds')
                 self.refresh_parts_list()
                 self._draw(highlight_name="Bounds")
@@ -267,31 +461,44 @@ class MainWindow(QtWidgets.QMainWindow):
         self.combo_enclosure_mode.setCurrentText(ui_restore["enclosure_mode_text"])
         self.spin_pad.setValue(ui_restore["enclosure_pad_percent"])
         self.combo_mode.setCurrentText(ui_restore["render_mode_text"])
-        # Load mesh if available
+        # Load mesh if available (in the background); assignments are applied once it's in
         if mesh_path and os.path.exists(mesh_path):
-            self._load_mesh_from_path(mesh_path)
+            self._load_mesh_from_path(mesh_path, then=lambda: self._apply_project_assignments(data))
         else:
             self.logger.log("Project has no mesh_path or file missing. Load a model manually.", error=True)
-        # Apply assignments to existing parts
-        applied = 0
-        for name, _ in self.state.parts:
-            if name in data.get("assignments", {}):
-                self.state.assignments[name] = data["assignments"][name]
-                applied += 1
+            self._apply_project_assignments(data)
+
+    def _apply_project_assignments(self, data: dict):
+        # Apply stored assignments that name an existing part
+        stored = data.get("assignments") or {}
+        keep = {k: v for k, v in stored.items() if self.state.has_part(k)}
+        self.state.assign_many(keep)
+        applied = len(keep)
         self.logger.log(f"Restored {applied} material assignments from project.")
         self.refresh_parts_list()
         self._draw()
 
+    def _reapply_assignments(self, saved: dict):
+        # after a reload: keep the assignments of parts that are still there
+        keep = {k: v for k, v in saved.items() if self.state.has_part(k)}
+        self.state.assign_many(keep)
+        self.logger.log(f"Kept {len(keep)} of {len(saved)} material assignments after reloading the mesh.")
+        self.refresh_parts_list()
+        self._draw()
+
     def new_project(self):
+        self._cancel_mesh_load()
         self.state = ProjectState()
         self.current_project_file = None
         self.current_mesh_path = None
         self.parts_list.clear()
+        self._parts_rows = []
         self.search_mat.clear()
         self.combo_mode.setCurrentText("Shaded")
         self.chk_enclosure.setChecked(True)
         self.combo_enclosure_mode.setCurrentText("AABB (fast)")
         self.spin_pad.setValue(5)
+        self._sync_watched_files()
         self.logger.log("New project.")
 
     def open_project(self):
@@ -301,26 +508,32 @@ class MainWindow(QtWidgets.QMainWindow):
         if not path:
             return
         try:
-            data = json.load(open(path, "r", encoding="utf-8"))
+            data = read_json(path)
+            self._cancel_mesh_load()        # don't let a load from before land in this project
             self.current_project_file = path
             self._load_project_dict(data)
+            self._sync_watched_files()
             self.logger.log(f"Opened project: {os.path.basename(path)}")
         except Exception:
-            err = log_exc("Open project failed")
-            self.logger.log(err, error=True)
-            QtWidgets.QMessageBox.critical(self, "Open Project Failed", err)
+            self._report_error("Open Project Failed", *log_exc("Open project failed"))
 
     def save_project(self):
         if not self.current_project_file:
             return self.save_project_as()
         try:
             data = self._serialize_project()
-            json.dump(data, open(self.current_project_file, "w", encoding="utf-8"), indent=2)
+            payload = dumps_json(data)
+            # skip the write when this exact content was already saved to this file
+            saved = (self.current_project_file, hashlib.blake2b(payload, digest_size=16).digest())
+            if saved == self._last_saved_hash:
+                self.logger.log(f"Project unchanged: {os.path.basename(self.current_project_file)}")
+                return
+            write_atomic(self.current_project_file, payload)
+            self._last_saved_hash = saved
+            self._sync_watched_files()
             self.logger.log(f"Saved project: {os.path.basename(self.current_project_file)}")
         except Exception:
-            err = log_exc("Save project failed")
-            self.logger.log(err, error=True)
-            QtWidgets.QMessageBox.critical(self, "Save Project Failed", err)
+            self._report_error("Save Project Failed", *log_exc("Save project failed"))
 
     def save_project_as(self):
         path, _ = QtWidgets.QFileDialog.getSaveFileName(
@@ -1,38 +1,238 @@
-import json
+import bisect, os
 import numpy as np
 from materials import Material        # <-- no ATLAS_Round_One.
-from bands import resample_bands      # <-- direct file imports
+from bands import BandResampler       # <-- direct file imports
+from project_io import read_json
+
+try:
+    import simdjson     # optional: lazy On-Demand parsing of the library
+except ImportError:
+    simdjson = None
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "atlas")
+
+
+def _stack_materials(items, bands):
+    """(names, alpha (N, B), scatter (N, B)) float32 for the materials sampled on `bands`."""
+    nb = len(bands)
+    names = [n for n, m in items.items()
+             if m.freqs is bands and len(m.alpha) == nb and len(m.scatter) == nb]
+    if not names:
+        return [], None, None
+    alpha = np.stack([items[n].alpha for n in names]).astype(np.float32, copy=False)
+    scatter = np.stack([items[n].scatter for n in names]).astype(np.float32, copy=False)
+    return names, alpha, scatter
+
+
+def _to_f64(seq):
+    """1-D float64 array from a homogeneous number sequence (JSON list, simdjson array)."""
+    return np.fromiter(seq, dtype=np.float64, count=len(seq))
+
+
+def _zero_row(n):
+    # one read-only tau row shared by every library material
+    tau = np.zeros(n, dtype=np.float32)
+    tau.flags.writeable = False
+    return tau
 
 
 class MaterialDB:
-    def __init__(self, native_bands, items):
+    def __init__(self, native_bands, items, _soa=None):
         self.native_bands = native_bands
         self.items = items
+        self._band_lookup = None     # {freq: index}, built on first band_index()
+        # Struct-of-arrays storage: library materials' alpha/scatter are row views
+        # into these float32 (N, B) matrices (see _from_records / _from_arrays).
+        self._names, self._alpha_mat, self._scatter_mat = (
+            _soa if _soa is not None else _stack_materials(items, native_bands))
+        self._sort_names()
+
+    def _sort_names(self):
+        # Case-insensitive order, so _sorted_lower is itself sorted and the two
+        # lists stay index-aligned; add() keeps both in order with bisect.
+        self._sorted_names = sorted(self.items, key=lambda n: (n.lower(), n))
+        self._sorted_lower = [n.lower() for n in self._sorted_names]
+
+    def add(self, mat):
+        """Insert (or replace) a material, keeping the sorted name lists current."""
+        name = mat.name
+        if name not in self.items:
+            low = name.lower()
+            i = bisect.bisect_right(self._sorted_lower, low)
+            self._sorted_lower.insert(i, low)
+            self._sorted_names.insert(i, name)
+        self.items[name] = mat
+
+    def sorted_names(self):
+        if len(self._sorted_names) != len(self.items):
+            self._sort_names()   # items was mutated directly; resync
+        return self._sorted_names
+
+    def names_matching(self, query, prefix=False):
+        """Sorted names containing (or, with prefix=True, starting with) query, case-insensitively."""
+        names = self.sorted_names()
+        q = query.lower()
+        if not q:
+            return names
+        lower = self._sorted_lower
+        if prefix:
+            lo = bisect.bisect_left(lower, q)
+            hi = bisect.bisect_left(lower, q + "\U0010ffff", lo)
+            return names[lo:hi]
+        return [n for n, low in zip(names, lower) if q in low]
+
+    def band_index(self, freq):
+        """Index of the native band centred on freq (exact match; raises KeyError otherwise)."""
+        lookup = self._band_lookup
+        if lookup is None:
+            lookup = self._band_lookup = {float(f): i for i, f in enumerate(self.native_bands)}
+        return lookup[float(freq)]
 
     @classmethod
     def from_json(cls, path):
-        data = json.load(open(path, "r", encoding="utf-8"))
-        bands = np.array(data["_meta"]["bands_hz"], float)
-        items = {}
+        if simdjson is not None:
+            return cls._from_simdjson(path)
+        data = read_json(path)
+        bands = _to_f64(data["_meta"]["bands_hz"])
+        records = []
         for name, rec in data["materials"].items():
-            alpha = np.array(rec.get("alpha", []), float)
-            scatter = np.array(rec.get("scatter", [0]*len(alpha)), float)
+            scatter = rec.get("scatter")
+            records.append((name, rec.get("kind", "generic"), _to_f64(rec.get("alpha") or ()),
+                            None if scatter is None else _to_f64(scatter)))
+        return cls._from_records(bands, records)
+
+    @classmethod
+    def _from_simdjson(cls, path):
+        # Only the fields we use are materialized; everything else stays unparsed.
+        doc = simdjson.Parser().load(path)
+        bands = _to_f64(doc["_meta"]["bands_hz"])
+        records = []
+        for name, rec in doc["materials"].items():
+            scatter = rec.get("scatter")
+            records.append((name, str(rec.get("kind", "generic")), _to_f64(rec.get("alpha") or ()),
+                            None if scatter is None else _to_f64(scatter)))
+        return cls._from_records(bands, records)
+
+    @classmethod
+    def _from_records(cls, bands, records):
+        """
+        records: (name, kind, alpha, scatter or None) in library order. Materials sampled
+        on `bands` are written straight into the float32 matrices and get row views;
+        any with a different length keep standalone float64 arrays.
+        """
+        nb = len(bands)
+        fits = [len(a) == nb and (s is None or len(s) == nb) for _, _, a, s in records]
+        alpha_mat = np.empty((sum(fits), nb), dtype=np.float32)
+        scatter_mat = np.zeros((sum(fits), nb), dtype=np.float32)
+        tau = _zero_row(nb)
+        names, items = [], {}
+        for (name, kind, alpha, scatter), fit in zip(records, fits):
+            if fit:
+                i = len(names)
+                alpha_mat[i] = alpha
+                if scatter is not None:
+                    scatter_mat[i] = scatter
+                names.append(name)
+                items[name] = Material(
+                    name=name, freqs=bands,
+                    alpha=alpha_mat[i],
+                    tau=tau,
+                    scatter=scatter_mat[i],
+                    kind=kind
+                )
+            else:
+                alpha = np.asarray(alpha, dtype=float)
+                scatter = np.zeros_like(alpha) if scatter is None else np.asarray(scatter, dtype=float)
+                items[name] = Material(
+                    name=name, freqs=bands,
+                    alpha=alpha,
+                    tau=np.zeros_like(alpha),
+                    scatter=scatter,
+                    kind=kind
+                )
+        return cls(native_bands=bands, items=items, _soa=(names, alpha_mat, scatter_mat))
+
+    @classmethod
+    def _from_arrays(cls, bands, names, kinds, alpha, scatter):
+        """Build from stacked (N, B) alpha/scatter matrices; each Material gets row views."""
+        alpha = np.ascontiguousarray(alpha, dtype=np.float32)
+        scatter = np.ascontiguousarray(scatter, dtype=np.float32)
+        tau = _zero_row(len(bands))
+        items = {}
+        for i, name in enumerate(names):
             items[name] = Material(
                 name=name, freqs=bands,
-                alpha=alpha,
-                tau=np.zeros_like(alpha),
-                scatter=scatter,
-                kind=rec.get("kind","generic")
+                alpha=alpha[i],
+                tau=tau,
+                scatter=scatter[i],
+                kind=kinds[i]
+            )
+        return cls(native_bands=bands, items=items, _soa=(list(names), alpha, scatter))
+
+    @classmethod
+    def load_cached(cls, path, cache_dir=CACHE_DIR):
+        """
+        from_json() backed by an .npz in cache_dir (bands, stacked alpha/scatter
+        matrices, names, kinds), keyed on the library's path, mtime and size.
+        Any cache miss or cache error falls back to parsing the JSON.
+        """
+        st = os.stat(path)
+        key = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}"
+        cache_file = os.path.join(cache_dir, "matlib.npz")
+        try:
+            with np.load(cache_file, allow_pickle=False) as z:
+                if str(z["key"]) == key:
+                    return cls._from_arrays(z["bands"], z["names"].tolist(), z["kinds"].tolist(),
+                                            z["alpha"], z["scatter"])
+        except Exception:
+            pass
+        db = cls.from_json(path)
+        try:
+            names = list(db.items)
+            mats = [db.items[n] for n in names]
+            arrays = dict(
+                key=np.array(key),
+                bands=np.asarray(db.native_bands, dtype=float),
+                names=np.array(names),
+                kinds=np.array([m.kind for m in mats]),
+                alpha=np.stack([m.alpha for m in mats]),      # raises on ragged rows -> no cache
+                scatter=np.stack([m.scatter for m in mats]),
             )
-        return cls(native_bands=bands, items=items)
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = cache_file + ".tmp"
+            with open(tmp, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, cache_file)
+        except Exception:
+            pass
+        return db
 
     def to_bands(self, dst_freqs):
+        tau = _zero_row(len(dst_freqs))
+
+        # Library materials: two gather+blend passes over the (N, B) matrices
+        stacked = {}
+        if self._alpha_mat is not None:
+            rs = BandResampler(self.native_bands, dst_freqs)
+            shape = (self._alpha_mat.shape[0], len(dst_freqs))
+            A = rs.resample_matrix(self._alpha_mat, np.empty(shape, dtype=np.float32))
+            S = rs.resample_matrix(self._scatter_mat, np.empty(shape, dtype=np.float32))
+            for i, n in enumerate(self._names):
+                stacked[n] = (A[i], S[i])
+
         out = {}
+        resamplers = {}   # anything added after load (e.g. Free Space), per source band array
         for n, m in self.items.items():
-            a = resample_bands(m.freqs, m.alpha, dst_freqs)
-            s = resample_bands(m.freqs, m.scatter, dst_freqs)
+            if n in stacked:
+                a, s = stacked[n]
+            else:
+                rs = resamplers.get(id(m.freqs))
+                if rs is None:
+                    rs = resamplers[id(m.freqs)] = BandResampler(m.freqs, dst_freqs)
+                a = rs(m.alpha)
+                s = rs(m.scatter)
             out[n] = Material(
                 name=n, freqs=dst_freqs, alpha=a,
-                tau=np.zeros_like(a), scatter=s, kind=m.kind
+                tau=tau, scatter=s, kind=m.kind
             )
         return out
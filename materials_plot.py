@@ -8,22 +8,29 @@ class MatPlotMini(FigureCanvas):
         fig = Figure(figsize=(width, height), dpi=dpi)
         self.ax = fig.add_subplot(111)
         super().__init__(fig)
-
-    def plot_absorption(self, freqs, alpha, scatter=None, title=None):
-        self.ax.clear()
-        f = np.asarray(freqs, dtype=float)
-        a = np.asarray(alpha, dtype=float)
-        self.ax.semilogx(f, a, marker='o', linewidth=1)
+        # Artists are built once; plot_absorption only swaps their data.
+        self.ax.set_xscale("log")
+        self._line_a, = self.ax.plot([], [], marker='o', linewidth=1)
+        self._line_s, = self.ax.plot([], [], linestyle='--', alpha=0.6)
+        self._line_s.set_visible(False)
         self.ax.set_ylim(0, 1.05)
-        self.ax.set_xlim(max(20, f.min()*0.9), f.max()*1.1)
         self.ax.grid(True, which='both', alpha=0.3)
         self.ax.set_xlabel("Frequency (Hz)")
         self.ax.set_ylabel("Absorption α")
-        if title:
-            self.ax.set_title(title, fontsize=10)
+        self._legend = self.ax.legend([self._line_a, self._line_s], ["α", "scatter"],
+                                      fontsize=8, loc='lower right')
+        self._legend.set_visible(False)
+
+    def plot_absorption(self, freqs, alpha, scatter=None, title=None):
+        f = np.asarray(freqs, dtype=float)
+        a = np.asarray(alpha, dtype=float)
+        self._line_a.set_data(f, a)
         # optional scatter overlay
-        if scatter is not None:
-            s = np.asarray(scatter, dtype=float)
-            self.ax.semilogx(f, s, linestyle='--', alpha=0.6)
-            self.ax.legend(["α", "scatter"], fontsize=8, loc='lower right')
-        self.draw()
+        has_scatter = scatter is not None
+        if has_scatter:
+            self._line_s.set_data(f, np.asarray(scatter, dtype=float))
+        self._line_s.set_visible(has_scatter)
+        self._legend.set_visible(has_scatter)
+        self.ax.set_xlim(max(20, f.min()*0.9), f.max()*1.1)
+        self.ax.set_title(title or "", fontsize=10)
+        self.draw_idle()
@@ -1,12 +1,14 @@
 # materials_tools.py
-import inspect
 import numpy as np
 
-def ensure_free_space_material(matlib, refresh_fn, logger,
-                               name_candidates=("Free Space", "FreeSpace", "Boundary", "Absorbing Boundary")):
+__all__ = ["ensure_free_space_material"]
+
+_FREE_SPACE_CANDIDATES = ("Free Space", "FreeSpace", "Boundary", "Absorbing Boundary")
+
+def ensure_free_space_material(matlib, refresh_fn, logger, name_candidates=_FREE_SPACE_CANDIDATES):
     """
     Ensure a 'Free Space' (or equivalent) material exists in matlib.
-    If missing, create a synthetic one compatible with your Material class signature.
+    If missing, create a synthetic fully-absorbing one on the library's native bands.
     Returns the chosen/created name, or None on failure.
     """
     if matlib is None:
@@ -34,44 +36,23 @@ def ensure_free_space_material(matlib, refresh_fn, logger,
         # Get bands without boolean evaluation of arrays
         freqs_attr = getattr(matlib, "native_bands", None)
         if freqs_attr is None:
-            freqs = [125, 250, 500, 1000, 2000, 4000]
+            freqs = np.array([125, 250, 500, 1000, 2000, 4000], dtype=np.float64)
         else:
-            freqs = np.asarray(freqs_attr, dtype=float).ravel().tolist()
+            freqs = np.asarray(freqs_attr, dtype=np.float64).ravel()
 
         n = len(freqs)
-        alpha = [1.0] * n     # fully absorbing
-        scatter = [0.0] * n   # no scatter
-        tau = [0.0] * n       # default if required
-
-        # Build kwargs only for parameters the constructor accepts
-        sig = inspect.signature(Material.__init__)
-        params = sig.parameters
-
-        kwargs = {}
-        if "name" in params:    kwargs["name"] = "Free Space"
-        if "alpha" in params:   kwargs["alpha"] = alpha
-        if "scatter" in params: kwargs["scatter"] = scatter
-        if "freqs" in params:   kwargs["freqs"] = freqs
-        if "tau" in params:     kwargs["tau"] = tau
-        # common alternates
-        if "bands" in params and "bands" not in kwargs:
-            kwargs["bands"] = freqs
-        if "absorption" in params and "absorption" not in kwargs:
-            kwargs["absorption"] = alpha
+        mat = Material(
+            name="Free Space",
+            freqs=freqs,
+            alpha=np.ones(n, dtype=np.float64),     # fully absorbing
+            tau=np.zeros(n, dtype=np.float64),
+            scatter=np.zeros(n, dtype=np.float64),  # no scatter
+        )
 
-        mat = Material(**kwargs)
-
-        # Coerce attributes to numpy arrays if needed, without ambiguous truth checks
-        for attr, val in (("alpha", alpha), ("scatter", scatter), ("freqs", freqs), ("tau", tau)):
-            if hasattr(mat, attr):
-                current = getattr(mat, attr)
-                if not isinstance(current, np.ndarray):
-                    try:
-                        setattr(mat, attr, np.asarray(val, dtype=float))
-                    except Exception:
-                        pass
-
-        items["Free Space"] = mat
+        if hasattr(matlib, "add"):
+            matlib.add(mat)          # keeps MaterialDB's sorted name index current
+        else:
+            items["Free Space"] = mat
         try:
             refresh_fn()
         except Exception:
@@ -1,23 +1,85 @@
 # project.py — manage state of the current ATLAS session
-import geometry
-import viz
+import numpy as np
+from geometry_tools import reorder_bounds_last
 
 class ProjectState:
     def __init__(self):
         self.mesh = None
-        self.parts = []          # list of (name, trimesh.Trimesh)
+        self.parts = []          # list of (name, trimesh.Trimesh); see the property below
         self.matlib = None       # MaterialDB
         self.assignments = {}    # part_name -> material_name
         self.current_part_index = -1
+        # Bumped on every assignments change; keys the colour cache below.
+        # Mutate assignments through assign()/clear_assignments() so it stays in sync.
+        self.assign_ver = 0
+        self._colors_cache = None    # (assign_ver, parts list, ndarray)
+
+    @property
+    def parts(self):
+        return self._parts
+
+    @parts.setter
+    def parts(self, parts):
+        # rebinding keeps the derived views in step (so rebind, don't mutate in place)
+        self._parts = parts
+        self._names = {n for n, _ in parts}
+        self._parts_display = None
+        self._row_prefixes = None
+
+    @property
+    def parts_display(self):
+        """parts in display order (Bounds last), computed once per parts list."""
+        if self._parts_display is None:
+            self._parts_display = reorder_bounds_last(self._parts)
+        return self._parts_display
+
+    @property
+    def row_prefixes(self):
+        """Static "name | faces | area" row text, aligned with parts_display."""
+        if self._row_prefixes is None:
+            self._row_prefixes = [f"{name} | faces={len(comp.faces)} | area={comp.area:.3f}"
+                                  for name, comp in self.parts_display]
+        return self._row_prefixes
+
+    def has_part(self, name):
+        return name in self._names
 
     def set_parts(self, mesh, comps):
         """Update project state with a new mesh + components."""
         self.mesh = mesh
         self.parts = [(f"Part_{i}", c) for i, c in enumerate(comps)]
+        self.clear_assignments()
+
+    def assign(self, part_name, mat_name):
+        self.assignments[part_name] = mat_name
+        self.assign_ver += 1
+
+    def assign_many(self, mapping):
+        """Apply several part -> material assignments with a single version bump."""
+        if mapping:
+            self.assignments.update(mapping)
+            self.assign_ver += 1
+
+    def clear_assignments(self):
         self.assignments.clear()
+        self.assign_ver += 1
 
-    def material_color_map(self):
-        cmap = {}
-        for part_name, mat_name in self.assignments.items():
-            cmap[part_name] = viz.material_color(mat_name, alpha=0.95)
-        return cmap
+    def material_color_array(self):
+        """(len(parts), 4) float32 RGBA in self.parts order; unassigned parts get the default."""
+        cached = self._colors_cache
+        if cached is not None and cached[0] == self.assign_ver and cached[1] is self.parts:
+            return cached[2]
+        import viz
+        colors = np.empty((len(self.parts), 4), dtype=np.float32)
+        colors[:] = viz.DEFAULT_PART_COLOR
+        rows, mats = [], []
+        for i, (name, _) in enumerate(self.parts):
+            mat_name = self.assignments.get(name)
+            if mat_name is not None:
+                rows.append(i)
+                mats.append(mat_name)
+        if rows:
+            colors[rows] = viz.material_colors(mats, alpha=0.95)
+        # the parts list is held, not just its id, so a recycled id can't alias it
+        self._colors_cache = (self.assign_ver, self.parts, colors)
+        return colors
@@ -1,4 +1,50 @@
 # project_io.py
+import json, mmap, os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_default(obj):
+    # numpy arrays / scalars (e.g. array-valued settings) -> plain lists / numbers
+    tolist = getattr(obj, "tolist", None)
+    if tolist is not None:
+        return tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps_json(data) -> bytes:
+    """Indented UTF-8 JSON bytes (orjson when installed, stdlib json otherwise); numpy values allowed."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_json_default,
+                            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, indent=2, default=_json_default).encode("utf-8")
+
+def loads_json(buf):
+    if orjson is not None:
+        return orjson.loads(buf)
+    return json.loads(buf)
+
+def read_json(path):
+    """Parse a JSON file; with orjson the file is mmapped and parsed in place."""
+    with open(path, "rb") as f:
+        if orjson is not None:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                pass                # empty file: can't map zero bytes, let the parser complain
+            else:
+                with mm, memoryview(mm) as buf:
+                    return orjson.loads(buf)
+        return loads_json(f.read())
+
+def write_atomic(path, payload: bytes):
+    """Write bytes to path via a temp file + os.replace, so readers never see a partial file."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
 
 def serialize_project(*, mesh_path, assignments, render_mode, enclosure, version=1):
     """
@@ -1,12 +1,70 @@
-# viz.py — GPU-accelerated VisPy viewer (MSAA, depth, smooth shading) with highlight & wireframe
+# viz.py — GPU-accelerated VisPy viewer (MSAA, depth, flat/smooth shading) with highlight & wireframe
+import itertools, math, os, weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import numpy as np
+from caching import LRUCache
 
 try:
-    from vispy import scene
+    from vispy import gloo, scene
     from vispy.scene import visuals
+    from vispy.geometry import MeshData
 except Exception:
+    gloo = None
     scene = None
     visuals = None
+    MeshData = None
+
+try:
+    from PySide6 import QtCore   # the ATLAS GUI's Qt binding; used to coalesce repaints
+except Exception:
+    QtCore = None
+
+try:
+    import meshoptimizer   # optional: vertex-cache friendly triangle order for static parts
+except Exception:
+    meshoptimizer = None
+
+DEFAULT_PART_COLOR = (0.8, 0.85, 0.9, 0.95)
+HIGHLIGHT_COLOR = (1.0, 0.85, 0.2, 0.95)
+
+WIRE_COLOR = (1.0, 1.0, 1.0, 1.0)
+WIRE_HIGHLIGHT_COLOR = (1.0, 0.9, 0.2, 1.0)
+
+# Visuals owned by the last view drawn into. They are kept between draw_parts()
+# calls and updated in place (set_data / recolor) rather than rebuilt, and
+# set_highlight() recolors them directly.
+#   mesh / smooth / line: records for the batched flat- and smooth-shaded Meshes and
+#              the wireframe Line (see _sync_batch)
+#   bufs: _PART_BUFFERS entries of the parts last drawn; a part whose geometry changed
+#         gets a new entry, so comparing these tells recolors from geometry changes
+_drawn = {"view": None, "mode": None, "mesh": None, "smooth": None, "line": None,
+          "bufs": [], "highlight": None}
+# (float32 (nv, 3) vertices, uint32 (nv,) part index) per concatenated part set, keyed
+# by the buffer entries' serials; shared by every batch drawing the same parts. Sets
+# with parts outside the current draw are dropped after each draw_parts().
+_POSITIONS = LRUCache(maxsize=4)
+# every visual draw_parts() has created, so teardown never has to scan the scene
+_owned_visuals = []
+# canvases with a repaint already queued by request_update()
+_pending_updates = weakref.WeakSet()
+# canvas -> ((h, w), FrameBuffer) kept by render_to() for repeated offscreen renders
+_OFFSCREEN = weakref.WeakKeyDictionary()
+
+# kind ("mesh"/"smooth"/"line") -> (float32 block, uint32 block): one host allocation per
+# batch for its per-vertex colors/normals and indices, reused by every rebuild; grown on
+# demand, and reallocated smaller once a rebuild needs under a quarter of it
+_STAGING = {}
+
+# id(comp) -> {"src": (vertices, faces), "V": float32 (n, 3), "F": uint32 (m, 3), plus
+# lazily "bounds", "N" normals and "E" uint32 edges}, so redraws reuse the converted
+# arrays; evicted when the comp is collected. Not size-capped: a cap below the live part
+# count would evict parts of the current draw and make every redraw a full rebuild.
+# Each entry also gets a "serial" from _serials, never reused by a later entry.
+_PART_BUFFERS = {}
+_serials = itertools.count()
+# worker threads for building missing _PART_BUFFERS entries (created on first use)
+_prep_pool = None
 
 
 def init_canvas():
@@ -36,82 +94,471 @@ def init_canvas():
     return canvas, view
 
 
-def draw_parts(view, parts, mode="shaded", color_map=None, highlight_name=None):
+def request_update(canvas):
+    """
+    Ask for one repaint of canvas at the next event-loop turn. Any number of calls
+    in the same turn (e.g. a mode toggle followed by a highlight) share that repaint.
+    Without a running Qt application this just calls canvas.update().
+    """
+    if QtCore is None or QtCore.QCoreApplication.instance() is None:
+        canvas.update()
+        return
+    if canvas in _pending_updates:
+        return
+    _pending_updates.add(canvas)
+    ref = weakref.ref(canvas)
+    QtCore.QTimer.singleShot(0, lambda: _flush_update(ref))
+
+
+def _flush_update(ref):
+    canvas = ref()
+    if canvas is not None:
+        _pending_updates.discard(canvas)
+        canvas.update()
+
+
+def render_to(canvas, buf):
+    """
+    Render the canvas offscreen into buf, an (H, W, 4) uint8 array (e.g. a frame of a
+    batch/headless export). The FBO is created once per canvas and size and reused;
+    SceneCanvas.render() allocates a new one (and its render buffers) every call.
+    """
+    if gloo is None:
+        raise RuntimeError("VisPy not available.")
+    h, w = buf.shape[:2]
+    cached = _OFFSCREEN.get(canvas)
+    if cached is None or cached[0] != (h, w):
+        fbo = gloo.FrameBuffer(color=gloo.RenderBuffer((h, w, 4)),
+                               depth=gloo.RenderBuffer((h, w), format="depth"))
+        _OFFSCREEN[canvas] = ((h, w), fbo)
+    else:
+        fbo = cached[1]
+    canvas.set_current()
+    # the steps SceneCanvas.render() takes, through the public canvas API
+    canvas.push_fbo(fbo, (0, 0), canvas.size)
+    try:
+        canvas.context.clear(color=canvas.bgcolor, depth=True)
+        canvas.draw_visual(canvas.scene)
+        # read() has no out= argument, so one temporary image remains
+        np.copyto(buf, fbo.read(alpha=True))
+    finally:
+        canvas.pop_fbo()
+    return buf
+
+
+def draw_parts(view, parts, mode="shaded", color_map=None, highlight_name=None, colors=None,
+               smooth_parts=None):
     """
     Draw list of (part_name, trimesh.Trimesh)
     - mode: "shaded" | "wireframe"
     - color_map: dict part_name -> (r,g,b,a)
     - highlight_name: part to glow (overrides color)
+    - colors: optional (N, 4) RGBA array parallel to parts; takes precedence over color_map
+    - smooth_parts: names drawn with smooth shading; everything else is flat shaded
+    All parts are batched into a single Mesh (one more for smooth_parts, or for
+    wireframe a single Line) with per-vertex colors. Visuals are reused across
+    calls: same geometry only recolors, new geometry goes through set_data.
     """
     if scene is None or visuals is None:
         raise RuntimeError("VisPy not available.")
 
-    # clear previous mesh/line visuals
-    for obj in list(view.scene.children):
-        if isinstance(obj, (visuals.Mesh, visuals.Line)):
-            obj.parent = None
+    if _drawn["view"] is not view:
+        # drawing into a different view: drop what we put in the previous one
+        for vis in _owned_visuals:
+            vis.parent = None
+        _owned_visuals.clear()
+        _drawn.update(view=view, mesh=None, smooth=None, line=None, bufs=[])
+        _POSITIONS.clear()
 
-    any_drawn = False
-    for name, comp in parts:
-        V = np.asarray(comp.vertices, dtype=np.float32)
-        F = np.asarray(comp.faces, dtype=np.uint32)
+    _prefetch_buffers([comp for _, comp in parts], edges=mode == "wireframe")
+    geoms = []   # (name, comp, V, F, base, buffer entry) for the non-empty parts
+    for i, (name, comp) in enumerate(parts):
+        buf = _part_buffers(comp)
+        V, F = buf["V"], buf["F"]
         if V.size == 0 or F.size == 0:
             continue
+        base = DEFAULT_PART_COLOR
+        if colors is not None:
+            base = colors[i]
+        elif color_map and name in color_map:
+            base = color_map[name]
+        geoms.append((name, comp, V, F, base, buf))
+
+    bufs = [g[5] for g in geoms]
+    if geoms and not _same_items(bufs, _drawn["bufs"]):
+        # fit the whole assembly; recolors and mode toggles keep the camera
+        bb_min = np.full(3, np.inf, dtype=np.float32)
+        bb_max = np.full(3, -np.inf, dtype=np.float32)
+        for buf in bufs:
+            lo, hi = _part_bounds(buf)
+            np.minimum(bb_min, lo, out=bb_min)
+            np.maximum(bb_max, hi, out=bb_max)
+        _autofit_camera(view, bb_min, bb_max)
+
+    flat, smooth, wire = [], [], []
+    if mode == "wireframe":
+        wire = [g[:4] + (WIRE_COLOR,) + g[5:] for g in geoms]
+    elif smooth_parts:
+        for g in geoms:
+            (smooth if g[0] in smooth_parts else flat).append(g)
+    else:
+        flat = geoms
+    _sync_batch("mesh", view, flat, highlight_name)
+    _sync_batch("smooth", view, smooth, highlight_name)
+    _sync_batch("line", view, wire, highlight_name)
+    # keep only the position arrays of this model, so a previous one isn't held alive
+    live = {b["serial"] for b in bufs}
+    _POSITIONS.discard_where(lambda key: not live.issuperset(key))
+    _drawn.update(mode=mode, bufs=bufs, highlight=highlight_name)
+    request_update(view.canvas)
+
+
+def _as_contiguous(a, dtype):
+    a = np.asarray(a)
+    if a.dtype == dtype and a.flags.c_contiguous:
+        return a
+    return np.ascontiguousarray(a, dtype=dtype)
+
+
+def _part_buffers(comp):
+    """
+    Draw-ready float32 vertices / uint32 faces for comp, converted once per geometry.
+    The entry is reused while comp still holds the same vertex/face arrays (trimesh
+    swaps in new arrays on process()/transforms); in-place writes aren't detected.
+    """
+    entry = _cached_buffers(comp)
+    if entry is None:
+        entry = _store_buffers(comp, _build_buffers(comp))
+    return entry
+
+
+def _cached_buffers(comp):
+    entry = _PART_BUFFERS.get(id(comp))
+    if entry is not None and entry["src"][0] is comp.vertices and entry["src"][1] is comp.faces:
+        return entry
+    return None
+
+
+def _build_buffers(comp, edges=False):
+    # pure per-part work (no shared state), so it can run on a worker thread
+    verts, faces = comp.vertices, comp.faces
+    F = _vertex_cache_order(_as_contiguous(faces, np.uint32), len(verts))
+    entry = {"src": (verts, faces), "V": _as_contiguous(verts, np.float32), "F": F}
+    if len(entry["V"]):
+        _part_bounds(entry)
+    if edges:
+        entry["E"] = _edges_of(comp, F)
+    return entry
+
+
+def _store_buffers(comp, entry):
+    entry["serial"] = next(_serials)
+    key = id(comp)
+    if key not in _PART_BUFFERS:
+        try:
+            weakref.finalize(comp, _PART_BUFFERS.pop, key, None)
+        except TypeError:
+            # not weak-referenceable: don't cache, id() could be reused
+            return entry
+    _PART_BUFFERS[key] = entry
+    return entry
+
+
+def _prefetch_buffers(comps, edges=False):
+    """
+    Build the missing _PART_BUFFERS entries for comps on worker threads; most of the
+    work is NumPy (casts, reductions, edge dedupe), which releases the GIL. With edges,
+    entries cached by an earlier shaded draw also get their missing edges, so the
+    first switch to wireframe doesn't dedupe every part serially. The cache itself is
+    only touched here, on the calling thread.
+    """
+    todo, no_edges = [], []
+    for c in comps:
+        entry = _cached_buffers(c)
+        if entry is None:
+            todo.append(c)
+        elif edges and "E" not in entry:
+            no_edges.append((c, entry))
+    if len(todo) + len(no_edges) < 2:
+        return   # not worth the hand-off; _part_buffers / _part_edges build it inline
+    global _prep_pool
+    if _prep_pool is None:
+        _prep_pool = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1),
+                                        thread_name_prefix="viz-prep")
+    built = _prep_pool.map(lambda c: _build_buffers(c, edges), todo)
+    deduped = _prep_pool.map(lambda ce: _edges_of(ce[0], ce[1]["F"]), no_edges)
+    for comp, entry in zip(todo, built):
+        _store_buffers(comp, entry)
+    for (_, entry), E in zip(no_edges, deduped):
+        entry["E"] = E
 
-        if not any_drawn:
-            _autofit_camera(view, V)
 
-        if mode == "wireframe":
-            _draw_wireframe_part(view, V, comp,
-                                 (1.0, 1.0, 1.0, 1.0) if name != highlight_name else (1.0, 0.9, 0.2, 1.0))
+def _vertex_cache_order(F, nv):
+    """
+    F with its triangles reordered for GPU post-transform cache reuse (meshoptimizer,
+    when installed). Only the triangle order changes: vertex indices keep their
+    meaning, so edges and per-vertex normals still line up with the part.
+    """
+    if meshoptimizer is None or len(F) == 0:
+        return F
+    idx = F.reshape(-1)
+    out = np.empty_like(idx)
+    try:
+        meshoptimizer.optimize_vertex_cache(out, idx, idx.size, nv)
+    except Exception:
+        return F
+    return out.reshape(-1, 3)
+
+
+def _part_bounds(buf):
+    # per-part (min, max) corners, reduced once per geometry and kept in the buffer entry
+    bounds = buf.get("bounds")
+    if bounds is None:
+        V = buf["V"]
+        bounds = buf["bounds"] = (V.min(axis=0), V.max(axis=0))
+    return bounds
+
+
+def _part_normals(comp, buf):
+    # trimesh's (cached) vertex normals as float32, kept in the buffer entry
+    N = buf.get("N")
+    if N is None:
+        N = buf["N"] = _as_contiguous(comp.vertex_normals, np.float32)
+    return N
+
+
+def _same_items(a, b):
+    return len(a) == len(b) and all(x is y for x, y in zip(a, b))
+
+
+def _sync_batch(kind, view, geoms, highlight_name):
+    """
+    kind "mesh" / "smooth": one flat / smooth shaded Mesh for the given parts;
+    kind "line": one wireframe Line.
+    Vertices are concatenated with per-part offsets (faces / edges shifted to match)
+    and colored per vertex. The visual is created once; when the parts are the ones
+    already uploaded only the color array is rewritten. An empty geoms hides it.
+    """
+    rec = _drawn[kind]
+    if not geoms:
+        if rec is not None:
+            rec["visual"].visible = False
+        return
+    hl = WIRE_HIGHLIGHT_COLOR if kind == "line" else HIGHLIGHT_COLOR
+    # gate on the buffer entries, not the comps: a comp whose arrays were replaced
+    # must be restaged even though it is the same object
+    bufs = [g[5] for g in geoms]
+    if (rec is not None and _same_items(bufs, rec["bufs"])
+            and all(g[0] in rec["ranges"] for g in geoms)):
+        for name, _, _, _, base, _ in geoms:
+            lo, hi, _ = rec["ranges"][name]
+            rec["ranges"][name] = (lo, hi, base)
+        _fill_colors(rec["colors"], rec["part_ids"], geoms, highlight_name, hl)
+        _push_colors(rec)
+        rec["visual"].visible = True
+        return
+
+    index = [_part_edges(g[1]) for g in geoms] if kind == "line" else [g[3] for g in geoms]
+    nv = sum(len(g[2]) for g in geoms)
+    ni = sum(len(ix) for ix in index)
+    # flat shading derives face normals itself; only smooth needs the vertex normals
+    N_all, C_all, I_all = _stage(kind, nv, ni, index[0].shape[1], normals=kind == "smooth")
+    # The shaded and wireframe batches share one positions array, so a mode toggle
+    # restages no vertices. It is keyed on the buffer entries' serials: changed geometry
+    # gets new entries and so a fresh array instead of a stale one sized for the old parts.
+    pkey = tuple(b["serial"] for b in bufs)
+    shared = _POSITIONS.get(pkey)
+    fill_positions = shared is None
+    if fill_positions:
+        V_all = np.empty((nv, 3), dtype=np.float32)
+        part_ids = np.repeat(np.arange(len(geoms), dtype=np.uint32), [len(g[2]) for g in geoms])
+        _POSITIONS.put(pkey, (V_all, part_ids))
+    else:
+        V_all, part_ids = shared
+    ranges = {}   # name -> (first vertex, end vertex, base color)
+    voff = ioff = 0
+    for (name, comp, V, _, base, buf), ix in zip(geoms, index):
+        n, m = len(V), len(ix)
+        if fill_positions:
+            np.copyto(V_all[voff:voff + n], V)
+        if N_all is not None:
+            np.copyto(N_all[voff:voff + n], _part_normals(comp, buf))
+        np.add(ix, np.uint32(voff), out=I_all[ioff:ioff + m])
+        ranges[name] = (voff, voff + n, base)
+        voff += n
+        ioff += m
+    _fill_colors(C_all, part_ids, geoms, highlight_name, hl)
+
+    if kind != "line":
+        md = MeshData(vertices=V_all, faces=I_all, vertex_colors=C_all)
+        if N_all is not None:
+            # seed the normals trimesh already has, so VisPy doesn't re-derive them from
+            # the faces (MeshData has no public setter; set_vertices() resets this field)
+            md._vertex_normals = N_all
+    if rec is not None:
+        vis = rec["visual"]
+        if kind == "line":
+            vis.set_data(pos=V_all, connect=I_all, color=C_all)
         else:
-            col = (0.8, 0.85, 0.9, 0.95)
-            if color_map and name in color_map:
-                col = color_map[name]
-            if name == highlight_name:
-                col = (1.0, 0.85, 0.2, 0.95)  # highlight
-            visuals.Mesh(vertices=V, faces=F, color=col,
-                         parent=view.scene, shading="smooth")
-        any_drawn = True
+            vis.set_data(meshdata=md)
+        vis.visible = True
+    elif kind != "line":
+        vis = visuals.Mesh(meshdata=md, parent=view.scene,
+                           shading="smooth" if kind == "smooth" else "flat")
+    else:
+        vis = visuals.Line(pos=V_all, connect=I_all, color=C_all, width=1.0,
+                           parent=view.scene, antialias=True)
+    if rec is None:
+        _owned_visuals.append(vis)
+    _drawn[kind] = {"kind": kind, "visual": vis, "bufs": bufs, "colors": C_all,
+                    "part_ids": part_ids, "ranges": ranges, "highlight": hl}
+
+
+def _fill_colors(C_all, part_ids, geoms, highlight_name, hl):
+    # per-part palette (highlight folded in) expanded to vertices by one gather
+    palette = np.array([hl if g[0] == highlight_name else g[4] for g in geoms], dtype=np.float32)
+    np.take(palette, part_ids, axis=0, out=C_all)
 
-    view.canvas.update()
 
+def _stage(kind, nv, ni, index_width, normals):
+    """
+    Views for a batch rebuild: normals (nv, 3) or None and colors (nv, 4) packed back
+    to back in one float32 block, and indices (ni, index_width). Steady redraws
+    allocate nothing; a much smaller model gets smaller blocks, so the largest one
+    drawn isn't held for the whole session.
+    """
+    width = 7 if normals else 4
+    fblock, iblock = _STAGING.get(kind, (None, None))
+    fblock = _staging_block(fblock, nv * width, np.float32)
+    iblock = _staging_block(iblock, ni * index_width, np.uint32)
+    _STAGING[kind] = (fblock, iblock)
+    C = fblock[:nv * 4].reshape(nv, 4)
+    N = fblock[nv * 4:nv * 7].reshape(nv, 3) if normals else None
+    return N, C, iblock[:ni * index_width].reshape(ni, index_width)
 
+
+def _staging_block(block, size, dtype):
+    if block is None or block.size < size or block.size > 4 * size:
+        return np.empty(size, dtype=dtype)
+    return block
+
+
+def _push_colors(rec):
+    # hand the (edited) per-vertex color array back to the visual
+    vis = rec["visual"]
+    if rec["kind"] == "line":
+        vis.set_data(color=rec["colors"])
+    else:
+        vis.mesh_data.set_vertex_colors(rec["colors"])
+        vis.mesh_data_changed()
+
+
+def set_highlight(view, highlight_name=None):
+    """
+    Move the highlight on the parts drawn by the last draw_parts() call by
+    recoloring the two affected parts; no geometry is rebuilt or re-uploaded.
+    Returns False when there is nothing drawn for this view (use draw_parts).
+    """
+    if _drawn["view"] is not view or _drawn["mode"] is None:
+        return False
+    prev = _drawn["highlight"]
+    if prev == highlight_name:
+        return True
+    kinds = ("line",) if _drawn["mode"] == "wireframe" else ("mesh", "smooth")
+    for rec in (_drawn[k] for k in kinds):
+        if rec is None or not rec["visual"].visible:
+            continue
+        C = rec["colors"]
+        for name in (prev, highlight_name):
+            entry = rec["ranges"].get(name)
+            if entry is not None:
+                lo, hi, base = entry
+                C[lo:hi] = rec["highlight"] if name == highlight_name else base
+        _push_colors(rec)
+    _drawn["highlight"] = highlight_name
+    request_update(view.canvas)
+    return True
+
+
+def _fnv1a(s: str) -> int:
+    """32-bit FNV-1a of the UTF-8 bytes; unlike hash(), stable across interpreter runs."""
+    h = 0x811C9DC5
+    for b in s.encode("utf-8"):
+        h = ((h ^ b) * 0x01000193) & 0xFFFFFFFF
+    return h
+
+
+@lru_cache(maxsize=512)
 def material_color(name: str, alpha=0.95):
-    """Deterministic color from material name."""
-    h = abs(hash(name)) % (256 * 256 * 256)
+    """Deterministic color from material name (same in every session)."""
+    h = _fnv1a(name) & 0xFFFFFF
     r = ((h >> 16) & 255) / 255.0
     g = ((h >> 8) & 255) / 255.0
     b = (h & 255) / 255.0
     return (r * 0.8 + 0.2, g * 0.8 + 0.2, b * 0.8 + 0.2, alpha)
 
 
-def _draw_wireframe_part(view, V, comp, color):
+def material_colors(names, alpha=0.95):
+    """material_color() for a sequence of names at once, as an (N, 4) float32 array."""
+    h = np.fromiter((_fnv1a(n) & 0xFFFFFF for n in names),
+                    dtype=np.uint32, count=len(names))
+    out = np.empty((len(names), 4), dtype=np.float32)
+    for c, shift in enumerate((16, 8, 0)):
+        out[:, c] = ((h >> shift) & 255).astype(np.float32) * np.float32(0.8 / 255.0) + np.float32(0.2)
+    out[:, 3] = alpha
+    return out
+
+
+def _part_edges(comp):
+    # unique edges as uint32, extracted/converted once per geometry (kept in the buffer entry)
+    buf = _part_buffers(comp)
+    E = buf.get("E")
+    if E is None:
+        E = buf["E"] = _edges_of(comp, buf["F"])
+    return E
+
+
+def _edges_of(comp, F):
     try:
-        edges = comp.edges_unique
+        return _as_contiguous(comp.edges_unique, np.uint32)
     except Exception:
-        F = comp.faces
-        e01 = F[:, [0, 1]]
-        e12 = F[:, [1, 2]]
-        e20 = F[:, [2, 0]]
-        edges = np.unique(np.sort(np.vstack([e01, e12, e20]), axis=1), axis=0)
-
-    visuals.Line(pos=V.astype(np.float32),
-                 connect=edges.astype(np.uint32),
-                 color=color,
-                 width=1.0,
-                 parent=view.scene,
-                 antialias=True)
-
-
-def _autofit_camera(view, vertices: np.ndarray):
-    if vertices.size == 0:
-        return
-    bb_min = vertices.min(axis=0)
-    bb_max = vertices.max(axis=0)
+        return _unique_edges(F)
+
+
+def _unique_edges(faces):
+    """(E, 2) uint32 unique undirected edges of a triangle array."""
+    F = np.asarray(faces).astype(np.uint32, copy=False)
+    nf = F.shape[0]
+    # filled block-wise with plain slices, so no per-edge-set temporaries are made
+    e = np.empty((3 * nf, 2), dtype=np.uint32)
+    e[:nf] = F[:, 0:2]
+    e[nf:2 * nf] = F[:, 1:3]
+    e[2 * nf:, 0] = F[:, 2]
+    e[2 * nf:, 1] = F[:, 0]
+    # order each pair in place with element-wise min/max (no per-row sort), then pack
+    # (min, max) into one uint64 per edge: a 1-D unique instead of a row-wise one
+    a, b = e[:, 0], e[:, 1]
+    lo = np.minimum(a, b)
+    np.maximum(a, b, out=b)
+    np.copyto(a, lo)
+    key = b.astype(np.uint64)
+    key <<= np.uint64(32)
+    key |= a
+    # sort + neighbour compare: interior edges of a manifold part appear exactly twice,
+    # and this skips np.unique's extra bookkeeping
+    key.sort()
+    keep = np.empty(key.shape, dtype=bool)
+    keep[:1] = True
+    np.not_equal(key[1:], key[:-1], out=keep[1:])
+    key = key[keep]
+    return np.column_stack([(key & np.uint64(0xFFFFFFFF)).astype(np.uint32),
+                            (key >> np.uint64(32)).astype(np.uint32)])
+
+
+def _autofit_camera(view, bb_min: np.ndarray, bb_max: np.ndarray):
     center = (bb_min + bb_max) * 0.5
-    extent = float(np.linalg.norm(bb_max - bb_min))
-    extent = max(extent, 1e-3)
+    dx, dy, dz = (float(d) for d in bb_max - bb_min)
+    extent = max(math.sqrt(dx * dx + dy * dy + dz * dz), 1e-3)
     cam = view.camera
     cam.center = center
     cam.distance = extent * 1.6